@@ -1,44 +1,136 @@
 import os
 import sqlite3
 import threading
-from contextlib import contextmanager
-from typing import Any, Dict, Iterable, Optional
+import zlib
+from contextlib import ExitStack, contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 DB_PATH = os.environ.get("DB_PATH", "data/app.db")
+# With DB_SHARDS > 1, users and their ledger/payout rows are spread over that
+# many SQLite files next to DB_PATH, each with its own connection and writer
+# lock. DB_PATH then only holds app_config, transaction tracking and the
+# payout idempotency index.
+DB_SHARDS = max(1, int(os.environ.get("DB_SHARDS", "1") or "1"))
 
 _lock = threading.RLock()
 _conn: Optional[sqlite3.Connection] = None
 
 
+def _open(path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA foreign_keys=ON;")
+    return conn
+
+
 def _connect() -> sqlite3.Connection:
     global _conn
     if _conn is None:
-        os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-        _conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
-        _conn.row_factory = sqlite3.Row
-        _conn.execute("PRAGMA journal_mode=WAL;")
-        _conn.execute("PRAGMA foreign_keys=ON;")
+        _conn = _open(DB_PATH)
     return _conn
 
 
 @contextmanager
-def transaction():
-    conn = _connect()
-    with _lock:
+def _transaction_on(conn: sqlite3.Connection, lock: threading.RLock):
+    with lock:
         try:
             conn.execute("BEGIN IMMEDIATE")
             yield conn
             conn.execute("COMMIT")
-        except Exception:
+        except BaseException:
             conn.execute("ROLLBACK")
             raise
 
 
-def init_db():
-    conn = _connect()
-    with _lock:
-        conn.executescript(
+@contextmanager
+def transaction():
+    with _transaction_on(_connect(), _lock) as conn:
+        yield conn
+
+
+class _Shard:
+    def __init__(self, index: int, path: Optional[str]) -> None:
+        self.index = index
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        # The single-shard layout shares the global connection and lock
+        self.lock = _lock if path is None else threading.RLock()
+
+    def connect(self) -> sqlite3.Connection:
+        if self.path is None:
+            return _connect()
+        if self._conn is None:
+            with self.lock:
+                if self._conn is None:
+                    self._conn = _open(self.path)
+        return self._conn
+
+    @contextmanager
+    def transaction(self):
+        with _transaction_on(self.connect(), self.lock) as conn:
+            yield conn
+
+
+def _shard_path(index: int) -> str:
+    base, ext = os.path.splitext(DB_PATH)
+    return f"{base}.shard{index}{ext or '.db'}"
+
+
+_shards: List[_Shard] = (
+    [_Shard(0, None)] if DB_SHARDS == 1 else [_Shard(i, _shard_path(i)) for i in range(DB_SHARDS)]
+)
+
+
+def _shard_for_user(user_id: str) -> _Shard:
+    return _shards[zlib.crc32(user_id.encode("utf-8")) % DB_SHARDS]
+
+
+def _shard_for_payout(payout_id: int) -> _Shard:
+    # Sharded payout ids are allocated so that id - 1 is congruent to the shard index
+    return _shards[(int(payout_id) - 1) % DB_SHARDS]
+
+
+def _payout_ids_by_shard(payout_ids: Iterable[int]) -> Dict[_Shard, List[int]]:
+    grouped: Dict[_Shard, List[int]] = {}
+    for payout_id in payout_ids:
+        grouped.setdefault(_shard_for_payout(payout_id), []).append(payout_id)
+    return grouped
+
+
+_GLOBAL_SCHEMA = """
+            CREATE TABLE IF NOT EXISTS app_config (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+
+            CREATE TABLE IF NOT EXISTS ledger_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS payout_broadcasts (
+                tx_hash TEXT PRIMARY KEY,
+                root_hash TEXT NOT NULL,
+                nonce INTEGER NOT NULL,
+                gas_price INTEGER NOT NULL,
+                tx_json TEXT NOT NULL,
+                sent_block INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_payout_broadcasts_status ON payout_broadcasts(status);
+
+            -- Sharded layout only: idempotency keys across all shards
+            CREATE TABLE IF NOT EXISTS payout_idempotency (
+                idempotency_key TEXT PRIMARY KEY,
+                payout_id INTEGER NOT NULL
+            );
             """
+
+_LEDGER_SCHEMA = """
             CREATE TABLE IF NOT EXISTS users (
                 user_id TEXT PRIMARY KEY
             );
@@ -72,12 +164,63 @@ def init_db():
                 FOREIGN KEY(user_id) REFERENCES users(user_id) ON DELETE CASCADE
             );
 
-            CREATE TABLE IF NOT EXISTS app_config (
-                key TEXT PRIMARY KEY,
-                value TEXT
+            CREATE TABLE IF NOT EXISTS payout_schedule (
+                payout_id INTEGER PRIMARY KEY,
+                tier TEXT NOT NULL,
+                hold_until DATETIME NOT NULL,
+                released_at DATETIME,
+                FOREIGN KEY(payout_id) REFERENCES payouts(id) ON DELETE CASCADE
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_payouts_status ON payouts(status);
+            CREATE INDEX IF NOT EXISTS idx_payouts_tx_hash ON payouts(tx_hash);
+
+            CREATE TABLE IF NOT EXISTS import_checkpoints (
+                source TEXT PRIMARY KEY,
+                rows_done INTEGER NOT NULL,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
             );
             """
-        )
+
+_schema_ready = False
+
+
+def _check_shard_layout(conn: sqlite3.Connection) -> None:
+    row = conn.execute("SELECT value FROM ledger_meta WHERE key = 'shards'").fetchone()
+    if row is not None:
+        if int(row[0]) != DB_SHARDS:
+            raise RuntimeError(
+                f"{DB_PATH} was created with DB_SHARDS={row[0]}, not {DB_SHARDS}; "
+                "changing the shard count requires re-importing the ledger"
+            )
+        return
+    if DB_SHARDS > 1:
+        legacy = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users'"
+        ).fetchone()
+        if legacy and conn.execute("SELECT 1 FROM users LIMIT 1").fetchone():
+            raise RuntimeError(
+                f"{DB_PATH} already holds an unsharded ledger; "
+                "unset DB_SHARDS or start from an empty database"
+            )
+    conn.execute(
+        "INSERT INTO ledger_meta(key, value) VALUES('shards', ?)", (str(DB_SHARDS),)
+    )
+
+
+def init_db():
+    global _schema_ready
+    if _schema_ready:
+        return
+    conn = _connect()
+    with _lock:
+        conn.executescript(_GLOBAL_SCHEMA)
+        _check_shard_layout(conn)
+    for shard in _shards:
+        conn = shard.connect()
+        with shard.lock:
+            conn.executescript(_LEDGER_SCHEMA)
+    _schema_ready = True
 
 
 def get_balance(conn: sqlite3.Connection, user_id: str) -> int:
@@ -93,8 +236,15 @@ def ensure_user(conn: sqlite3.Connection, user_id: str) -> None:
     )
 
 
+def get_user_balance(user_id: str) -> int:
+    shard = _shard_for_user(user_id)
+    conn = shard.connect()
+    with shard.lock:
+        return get_balance(conn, user_id)
+
+
 def add_credits(user_id: str, credits: int, reason: str = "earn") -> int:
-    with transaction() as conn:
+    with _shard_for_user(user_id).transaction() as conn:
         ensure_user(conn, user_id)
         conn.execute(
             "INSERT INTO credits_ledger(user_id, delta, reason) VALUES(?,?,?)",
@@ -107,6 +257,141 @@ def add_credits(user_id: str, credits: int, reason: str = "earn") -> int:
         return get_balance(conn, user_id)
 
 
+def add_credits_bulk(
+    rows: Sequence[Tuple[str, int, str]],
+    checkpoint: Optional[Tuple[str, int]] = None,
+) -> int:
+    """Apply many (user_id, credits, reason) awards in one transaction per shard.
+
+    Ledger rows are written with ``executemany`` and ``balances`` is updated
+    once per user from the summed deltas. When ``checkpoint`` is given as
+    ``(source, rows_done)`` it is stored in each shard's transaction, so a
+    crash never leaves a shard's checkpoint ahead of (or behind) its data.
+    Shards whose checkpoint already covers ``rows_done`` skip the batch; see
+    :func:`get_import_checkpoint_range`.
+    """
+    if not rows and checkpoint is None:
+        return 0
+    by_shard: Dict[_Shard, List[Tuple[str, int, str]]] = {}
+    for row in rows:
+        by_shard.setdefault(_shard_for_user(row[0]), []).append(row)
+    applied = 0
+    for shard in _shards:
+        shard_rows = by_shard.get(shard, [])
+        if not shard_rows and checkpoint is None:
+            continue
+        with shard.transaction() as conn:
+            if checkpoint is not None:
+                done = conn.execute(
+                    "SELECT rows_done FROM import_checkpoints WHERE source = ?",
+                    (checkpoint[0],),
+                ).fetchone()
+                if done is not None and int(done[0]) >= checkpoint[1]:
+                    continue
+            _apply_credit_rows(conn, shard_rows)
+            applied += len(shard_rows)
+            if checkpoint is not None:
+                conn.execute(
+                    """
+                    INSERT INTO import_checkpoints(source, rows_done, updated_at)
+                    VALUES(?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(source) DO UPDATE SET
+                        rows_done = excluded.rows_done,
+                        updated_at = excluded.updated_at
+                    """,
+                    checkpoint,
+                )
+    return applied
+
+
+def _apply_credit_rows(conn: sqlite3.Connection, rows: Sequence[Tuple[str, int, str]]) -> None:
+    totals: Dict[str, int] = {}
+    for user_id, credits, _reason in rows:
+        totals[user_id] = totals.get(user_id, 0) + credits
+    conn.executemany(
+        "INSERT OR IGNORE INTO users(user_id) VALUES(?)",
+        ((user_id,) for user_id in totals),
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO balances(user_id, credits) VALUES(?, 0)",
+        ((user_id,) for user_id in totals),
+    )
+    conn.executemany(
+        "INSERT INTO credits_ledger(user_id, delta, reason) VALUES(?,?,?)",
+        rows,
+    )
+    conn.executemany(
+        "UPDATE balances SET credits = credits + ? WHERE user_id = ?",
+        ((delta, user_id) for user_id, delta in totals.items()),
+    )
+
+
+def get_import_checkpoint_range(source: str) -> Tuple[int, int]:
+    """Lowest and highest rows_done recorded for ``source`` across shards.
+
+    They only differ after a crash part-way through a sharded batch: resume
+    after the low mark and end the next batch exactly at the high mark, so
+    shards that already committed it skip it.
+    """
+    init_db()
+    done: List[int] = []
+    for shard in _shards:
+        conn = shard.connect()
+        with shard.lock:
+            row = conn.execute(
+                "SELECT rows_done FROM import_checkpoints WHERE source = ?", (source,)
+            ).fetchone()
+        done.append(int(row[0]) if row else 0)
+    return min(done), max(done)
+
+
+def get_import_checkpoint(source: str) -> int:
+    return get_import_checkpoint_range(source)[0]
+
+
+def clear_import_checkpoint(source: str) -> None:
+    for shard in _shards:
+        with shard.transaction() as conn:
+            conn.execute("DELETE FROM import_checkpoints WHERE source = ?", (source,))
+
+
+_BULK_PRAGMAS = {
+    "synchronous": "OFF",
+    "temp_store": "MEMORY",
+    "cache_size": "-262144",  # 256 MiB
+}
+
+@contextmanager
+def bulk_load() -> Iterator[None]:
+    """Relax durability PRAGMAs on the ledger connections for a large one-off load.
+
+    The previous settings are restored when the block exits. Indexes are left
+    in place: the tables written by :func:`add_credits_bulk` only have the
+    primary-key/unique indexes that its inserts depend on.
+    """
+    with ExitStack() as stack:
+        for shard in _shards:
+            stack.enter_context(_bulk_load_shard(shard))
+        yield
+
+
+@contextmanager
+def _bulk_load_shard(shard: _Shard) -> Iterator[None]:
+    conn = shard.connect()
+    with shard.lock:
+        previous = {
+            name: conn.execute(f"PRAGMA {name}").fetchone()[0] for name in _BULK_PRAGMAS
+        }
+        for name, value in _BULK_PRAGMAS.items():
+            conn.execute(f"PRAGMA {name}={value}")
+    try:
+        yield
+    finally:
+        with shard.lock:
+            for name, value in previous.items():
+                conn.execute(f"PRAGMA {name}={value}")
+
+
 def debit_credits_for_payout(
     user_id: str,
     credits: int,
@@ -114,8 +399,54 @@ def debit_credits_for_payout(
     units: str,
     asset: str,
     idempotency_key: Optional[str],
+    status: str = "pending",
+    hold_seconds: Optional[int] = None,
 ) -> Dict[str, Any]:
-    with transaction() as conn:
+    if DB_SHARDS > 1 and idempotency_key:
+        # Keys must be unique across users, not just within one shard. The
+        # global transaction serializes keyed payouts while the shard writes.
+        with transaction() as conn:
+            row = conn.execute(
+                "SELECT payout_id FROM payout_idempotency WHERE idempotency_key = ?",
+                (idempotency_key,),
+            ).fetchone()
+            if row is not None:
+                return get_payout(int(row[0]))
+            payout = _debit_on_shard(
+                user_id, credits, address, units, asset, idempotency_key, status, hold_seconds
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO payout_idempotency(idempotency_key, payout_id) VALUES(?, ?)",
+                (idempotency_key, payout["id"]),
+            )
+            return payout
+    return _debit_on_shard(
+        user_id, credits, address, units, asset, idempotency_key, status, hold_seconds
+    )
+
+
+def get_payout(payout_id: int) -> Dict[str, Any]:
+    shard = _shard_for_payout(payout_id)
+    conn = shard.connect()
+    with shard.lock:
+        row = conn.execute("SELECT * FROM payouts WHERE id = ?", (payout_id,)).fetchone()
+    if row is None:
+        raise KeyError(f"payout {payout_id} not found")
+    return dict(row)
+
+
+def _debit_on_shard(
+    user_id: str,
+    credits: int,
+    address: str,
+    units: str,
+    asset: str,
+    idempotency_key: Optional[str],
+    status: str,
+    hold_seconds: Optional[int],
+) -> Dict[str, Any]:
+    shard = _shard_for_user(user_id)
+    with shard.transaction() as conn:
         ensure_user(conn, user_id)
 
         # Idempotency: if key exists, return the existing payout
@@ -142,30 +473,278 @@ def debit_credits_for_payout(
             (credits, user_id),
         )
 
+        payout_id = None
+        if DB_SHARDS > 1:
+            # Keep ids unique across shards: each shard only uses ids with
+            # (id - 1) % DB_SHARDS == shard.index, see _shard_for_payout().
+            payout_id = conn.execute(
+                "SELECT COALESCE(MAX(id), ?) + ? FROM payouts",
+                (shard.index + 1 - DB_SHARDS, DB_SHARDS),
+            ).fetchone()[0]
         conn.execute(
             """
-            INSERT INTO payouts(user_id, address, credits, units, asset, status, idempotency_key)
-            VALUES(?,?,?,?,?,?,?)
+            INSERT INTO payouts(id, user_id, address, credits, units, asset, status, idempotency_key)
+            VALUES(?,?,?,?,?,?,?,?)
             """,
-            (user_id, address, credits, units, asset, "pending", idempotency_key),
+            (payout_id, user_id, address, credits, units, asset, status, idempotency_key),
         )
         payout_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        if hold_seconds is not None:
+            conn.execute(
+                """
+                INSERT INTO payout_schedule(payout_id, tier, hold_until)
+                VALUES(?, 'economy', datetime('now', ?))
+                """,
+                (payout_id, f"+{int(hold_seconds)} seconds"),
+            )
 
         cur = conn.execute("SELECT * FROM payouts WHERE id = ?", (payout_id,))
         return dict(cur.fetchone())
 
 
 def set_payout_sent(payout_id: int, tx_hash: str) -> None:
-    with transaction() as conn:
+    with _shard_for_payout(payout_id).transaction() as conn:
         conn.execute(
             "UPDATE payouts SET status = ?, tx_hash = ? WHERE id = ?",
             ("sent", tx_hash, payout_id),
         )
 
 
-def list_user_payouts(user_id: str) -> Iterable[Dict[str, Any]]:
+def release_held_payouts(limit: int, expired_only: bool) -> int:
+    """Move up to ``limit`` held payouts, earliest deadline first, to 'queued'.
+
+    With ``expired_only`` only rows whose hold deadline has passed are released.
+    Candidates are ranked across all shards, so no shard's payouts wait behind
+    another's.
+    """
+    candidates: List[Tuple[str, str, int]] = []
+    for shard in _shards:
+        conn = shard.connect()
+        with shard.lock:
+            cur = conn.execute(
+                f"""
+                SELECT s.hold_until, p.created_at, p.id
+                FROM payouts p JOIN payout_schedule s ON s.payout_id = p.id
+                WHERE p.status = 'held'
+                {"AND s.hold_until <= datetime('now')" if expired_only else ""}
+                ORDER BY s.hold_until, p.created_at, p.id
+                LIMIT ?
+                """,
+                (limit,),
+            )
+            candidates.extend((row[0], row[1], row[2]) for row in cur.fetchall())
+    candidates.sort()
+    released = 0
+    for shard, ids in _payout_ids_by_shard(row[2] for row in candidates[:limit]).items():
+        with shard.transaction() as conn:
+            for payout_id in ids:
+                cur = conn.execute(
+                    "UPDATE payouts SET status = 'queued' WHERE id = ? AND status = 'held'",
+                    (payout_id,),
+                )
+                if cur.rowcount:
+                    conn.execute(
+                        "UPDATE payout_schedule SET released_at = datetime('now') WHERE payout_id = ?",
+                        (payout_id,),
+                    )
+                    released += 1
+    return released
+
+
+def count_held_payouts() -> int:
+    total = 0
+    for shard in _shards:
+        conn = shard.connect()
+        with shard.lock:
+            total += int(conn.execute("SELECT COUNT(*) FROM payouts WHERE status = 'held'").fetchone()[0])
+    return total
+
+
+def due_payout_groups(min_age_seconds: int) -> List[Tuple[str, str]]:
+    """(address, asset) pairs whose oldest queued payout is at least this old."""
+    groups: Dict[Tuple[str, str], None] = {}
+    for shard in _shards:
+        conn = shard.connect()
+        with shard.lock:
+            cur = conn.execute(
+                """
+                SELECT address, asset FROM payouts
+                WHERE status = 'queued'
+                GROUP BY address, asset
+                HAVING MIN(created_at) <= datetime('now', ?)
+                """,
+                (f"-{int(min_age_seconds)} seconds",),
+            )
+            for row in cur.fetchall():
+                groups[(row[0], row[1])] = None
+    return list(groups)
+
+
+def claim_queued_payouts(address: str, asset: str) -> List[Dict[str, Any]]:
+    """Move every queued payout for (address, asset) to 'sending' and return them."""
+    rows: List[Dict[str, Any]] = []
+    for shard in _shards:
+        with shard.transaction() as conn:
+            cur = conn.execute(
+                "SELECT * FROM payouts WHERE status = 'queued' AND address = ? AND asset = ? ORDER BY id",
+                (address, asset),
+            )
+            shard_rows = [dict(row) for row in cur.fetchall()]
+            conn.executemany(
+                "UPDATE payouts SET status = 'sending' WHERE id = ?",
+                ((row["id"],) for row in shard_rows),
+            )
+        rows.extend(shard_rows)
+    for row in rows:
+        row["status"] = "sending"
+    rows.sort(key=lambda row: (row["created_at"], row["id"]))
+    return rows
+
+
+def set_payouts_sent(payout_ids: Sequence[int], tx_hash: str) -> None:
+    for shard, ids in _payout_ids_by_shard(payout_ids).items():
+        with shard.transaction() as conn:
+            conn.executemany(
+                "UPDATE payouts SET status = ?, tx_hash = ? WHERE id = ?",
+                (("sent", tx_hash, payout_id) for payout_id in ids),
+            )
+
+
+def set_payouts_status(payout_ids: Sequence[int], status: str) -> None:
+    for shard, ids in _payout_ids_by_shard(payout_ids).items():
+        with shard.transaction() as conn:
+            conn.executemany(
+                "UPDATE payouts SET status = ? WHERE id = ?",
+                ((status, payout_id) for payout_id in ids),
+            )
+
+
+def record_broadcast(
+    tx_hash: str,
+    root_hash: str,
+    nonce: int,
+    gas_price: int,
+    tx_json: str,
+) -> None:
+    """Remember a signed transaction so it can be fee-bumped or confirmed later.
+
+    ``root_hash`` is the hash of the first broadcast for this nonce; it is the
+    one stored in ``payouts.tx_hash`` until one of the chain gets mined.
+    ``sent_block`` stays 0 until the watcher stamps it, see
+    :func:`stamp_broadcasts`.
+    """
+    init_db()
+    with transaction() as conn:
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO payout_broadcasts(tx_hash, root_hash, nonce, gas_price, tx_json, sent_block)
+            VALUES(?,?,?,?,?,0)
+            """,
+            (tx_hash, root_hash, nonce, gas_price, tx_json),
+        )
+
+
+def fail_broadcast(tx_hash: str) -> None:
+    """Stop tracking a first broadcast whose send raised."""
+    with transaction() as conn:
+        conn.execute(
+            "UPDATE payout_broadcasts SET status = 'failed' WHERE tx_hash = ? AND status = 'pending'",
+            (tx_hash,),
+        )
+
+
+def stamp_broadcasts(tx_hashes: Sequence[str], block: int) -> None:
+    """Set ``sent_block`` on broadcasts the watcher sees for the first time."""
+    with transaction() as conn:
+        conn.executemany(
+            "UPDATE payout_broadcasts SET sent_block = ? WHERE tx_hash = ? AND sent_block = 0",
+            ((block, tx_hash) for tx_hash in tx_hashes),
+        )
+
+
+def pending_broadcast_chains() -> List[Dict[str, Any]]:
+    """Unresolved broadcasts grouped by root; ``latest`` is the highest-fee one."""
     conn = _connect()
     with _lock:
+        cur = conn.execute(
+            """
+            SELECT * FROM payout_broadcasts WHERE status = 'pending'
+            ORDER BY root_hash, gas_price
+            """
+        )
+        rows = [dict(row) for row in cur.fetchall()]
+    chains: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        chain = chains.setdefault(row["root_hash"], {"root_hash": row["root_hash"], "hashes": []})
+        chain["hashes"].append(row["tx_hash"])
+        if not row["sent_block"]:
+            chain.setdefault("unstamped", []).append(row["tx_hash"])
+        chain["latest"] = row
+    return list(chains.values())
+
+
+def _settle_payouts(
+    conn: sqlite3.Connection, hashes: Sequence[str], status: str, mined_hash: Optional[str]
+) -> int:
+    placeholders = ",".join("?" for _ in hashes)
+    cur = conn.execute(
+        f"""
+        UPDATE payouts SET status = ?, tx_hash = COALESCE(?, tx_hash)
+        WHERE status = 'sent' AND tx_hash IN ({placeholders})
+        """,
+        (status, mined_hash, *hashes),
+    )
+    return cur.rowcount
+
+
+def _settle_broadcast(root_hash: str, payout_status: str, mined_hash: Optional[str]) -> int:
+    # With several shards the payouts are updated before the chain is marked, so
+    # a crash in between leaves the chain pending and the watcher repeats the
+    # (idempotent) payout update on its next pass.
+    init_db()
+    with transaction() as conn:
+        hashes = [
+            row[0]
+            for row in conn.execute(
+                "SELECT tx_hash FROM payout_broadcasts WHERE root_hash = ?", (root_hash,)
+            ).fetchall()
+        ]
+        if DB_SHARDS == 1:
+            updated = _settle_payouts(conn, hashes, payout_status, mined_hash)
+        else:
+            updated = 0
+            for shard in _shards:
+                with shard.transaction() as shard_conn:
+                    updated += _settle_payouts(shard_conn, hashes, payout_status, mined_hash)
+        conn.execute(
+            """
+            UPDATE payout_broadcasts
+            SET status = CASE WHEN ? IS NULL THEN 'dropped'
+                              WHEN tx_hash = ? THEN 'mined' ELSE 'replaced' END
+            WHERE root_hash = ?
+            """,
+            (mined_hash, mined_hash, root_hash),
+        )
+    return updated
+
+
+def resolve_broadcast(root_hash: str, mined_hash: str, succeeded: bool) -> int:
+    """Mark a broadcast chain as mined and point its payouts at the mined hash."""
+    return _settle_broadcast(root_hash, "confirmed" if succeeded else "reverted", mined_hash)
+
+
+def drop_broadcast(root_hash: str) -> int:
+    """Give up on a chain whose nonce was used by an untracked transaction.
+
+    Its payouts move from 'sent' to 'dropped' for manual reconciliation.
+    """
+    return _settle_broadcast(root_hash, "dropped", None)
+
+
+def list_user_payouts(user_id: str) -> Iterable[Dict[str, Any]]:
+    shard = _shard_for_user(user_id)
+    conn = shard.connect()
+    with shard.lock:
         cur = conn.execute(
             "SELECT * FROM payouts WHERE user_id = ? ORDER BY id DESC",
             (user_id,),
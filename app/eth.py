@@ -1,18 +1,23 @@
 import asyncio
+import json
+import logging
 import threading
-from typing import Any, Dict, Optional
+import time
+from typing import Any, Dict, List, Optional
 
-from . import settings
+from . import db, settings
 
-try:
-    from web3 import Web3  # type: ignore
-    from eth_account import Account  # type: ignore
-except ImportError:  # pragma: no cover - optional dependency
-    Web3 = None  # type: ignore
-    Account = None  # type: ignore
+log = logging.getLogger(__name__)
+
+# web3/eth_account are imported on first use (see _import_web3) so importing
+# this module stays cheap and the server can bind before they are loaded.
+Web3: Optional[Any] = None
+Account: Optional[Any] = None
+_web3_import_attempted = False
 
 DEFAULT_CHAIN_ID = 11155111
 DEFAULT_UNITS_PER_CREDIT = 1_000_000_000_000_000  # 0.001 ETH
+BASE_FEE_CACHE_SECONDS = 12.0  # roughly one block
 
 
 def _load_int(name: str, default: int) -> int:
@@ -30,10 +35,35 @@ def _load_str(name: str) -> str:
     return value.strip() if isinstance(value, str) else ""
 
 
-CHAIN_ID = _load_int("CHAIN_ID", DEFAULT_CHAIN_ID)
-UNITS_PER_CREDIT = _load_int("UNITS_PER_CREDIT", DEFAULT_UNITS_PER_CREDIT)
-TOKEN_ADDRESS = _load_str("TOKEN_ADDRESS")
-TOKEN_DECIMALS_OVERRIDE = _load_str("TOKEN_DECIMALS")
+# Populated from settings by _load_config() on first initialization or reload()
+CHAIN_ID = DEFAULT_CHAIN_ID
+UNITS_PER_CREDIT = DEFAULT_UNITS_PER_CREDIT
+TOKEN_ADDRESS = ""
+TOKEN_DECIMALS_OVERRIDE = ""
+_config_loaded = False
+
+
+def _import_web3() -> bool:
+    global Web3, Account, _web3_import_attempted
+    if not _web3_import_attempted:
+        try:
+            from web3 import Web3 as _Web3  # type: ignore
+            from eth_account import Account as _Account  # type: ignore
+        except ImportError:  # pragma: no cover - optional dependency
+            _Web3 = None
+            _Account = None
+        Web3, Account = _Web3, _Account
+        _web3_import_attempted = True
+    return Web3 is not None and Account is not None
+
+
+def _load_config() -> None:
+    global CHAIN_ID, UNITS_PER_CREDIT, TOKEN_ADDRESS, TOKEN_DECIMALS_OVERRIDE, _config_loaded
+    CHAIN_ID = _load_int("CHAIN_ID", DEFAULT_CHAIN_ID)
+    UNITS_PER_CREDIT = _load_int("UNITS_PER_CREDIT", DEFAULT_UNITS_PER_CREDIT)
+    TOKEN_ADDRESS = _load_str("TOKEN_ADDRESS")
+    TOKEN_DECIMALS_OVERRIDE = _load_str("TOKEN_DECIMALS")
+    _config_loaded = True
 
 ERC20_ABI = [
     {
@@ -63,6 +93,61 @@ ERC20_ABI = [
 ]
 
 
+# Read-only views used by the website's token stats (LazyArtCoin exposes treasury())
+TOKEN_STATS_ABI = [
+    {"inputs": [], "name": "name", "outputs": [{"name": "", "type": "string"}], "stateMutability": "view", "type": "function"},
+    {"inputs": [], "name": "symbol", "outputs": [{"name": "", "type": "string"}], "stateMutability": "view", "type": "function"},
+    {"inputs": [], "name": "decimals", "outputs": [{"name": "", "type": "uint8"}], "stateMutability": "view", "type": "function"},
+    {"inputs": [], "name": "totalSupply", "outputs": [{"name": "", "type": "uint256"}], "stateMutability": "view", "type": "function"},
+    {"inputs": [], "name": "treasury", "outputs": [{"name": "", "type": "address"}], "stateMutability": "view", "type": "function"},
+    {
+        "inputs": [{"name": "account", "type": "address"}],
+        "name": "balanceOf",
+        "outputs": [{"name": "", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function",
+    },
+]
+
+# Multicall3 is deployed at the same address on mainnet, Sepolia and most EVM chains
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "allowFailure", "type": "bool"},
+                    {"name": "callData", "type": "bytes"},
+                ],
+                "name": "calls",
+                "type": "tuple[]",
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"name": "success", "type": "bool"},
+                    {"name": "returnData", "type": "bytes"},
+                ],
+                "name": "returnData",
+                "type": "tuple[]",
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function",
+    },
+    {
+        "inputs": [],
+        "name": "getBlockNumber",
+        "outputs": [{"name": "blockNumber", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function",
+    },
+]
+
+
 class PayoutConfigError(RuntimeError):
     pass
 
@@ -76,17 +161,25 @@ class _State:
     token_decimals: Optional[int] = None
     error: Optional[str] = None
     initialized: bool = False
+    initializing: bool = False
+    # Read-only connection for public reads when the payout engine is not ready
+    read_web3: Optional[Any] = None
+    # Whether Multicall3 is deployed on the configured chain (None: not checked yet)
+    has_multicall3: Optional[bool] = None
 
 
 _state = _State()
 _state_lock = threading.Lock()
+_init_start_lock = threading.Lock()
+_read_web3_lock = threading.Lock()
 nonce_lock = asyncio.Lock()
 
 
 def reload() -> None:
-    global CHAIN_ID, UNITS_PER_CREDIT, TOKEN_ADDRESS, TOKEN_DECIMALS_OVERRIDE
     with _state_lock:
         _state.web3 = None
+        _state.read_web3 = None
+        _state.has_multicall3 = None
         _state.payer_account = None
         _state.from_address = None
         _state.erc20 = None
@@ -94,10 +187,7 @@ def reload() -> None:
         _state.token_decimals = None
         _state.error = None
         _state.initialized = False
-    CHAIN_ID = _load_int("CHAIN_ID", DEFAULT_CHAIN_ID)
-    UNITS_PER_CREDIT = _load_int("UNITS_PER_CREDIT", DEFAULT_UNITS_PER_CREDIT)
-    TOKEN_ADDRESS = _load_str("TOKEN_ADDRESS")
-    TOKEN_DECIMALS_OVERRIDE = _load_str("TOKEN_DECIMALS")
+        _load_config()
 
 
 def _initialize_if_needed() -> None:
@@ -106,7 +196,9 @@ def _initialize_if_needed() -> None:
     with _state_lock:
         if _state.initialized or _state.error:
             return
-        if Web3 is None or Account is None:
+        if not _config_loaded:
+            _load_config()
+        if not _import_web3():
             _state.error = "web3.py dependencies are not installed"
             return
 
@@ -122,7 +214,7 @@ def _initialize_if_needed() -> None:
             return
 
         try:
-            web3 = Web3(Web3.HTTPProvider(provider, request_kwargs={"timeout": 30}))
+            web3 = Web3(_build_provider(provider))
         except Exception as exc:  # pragma: no cover - initialization error
             _state.error = f"Failed to create Web3 provider: {exc}"[:200]
             return
@@ -171,16 +263,87 @@ def _initialize_if_needed() -> None:
         _state.initialized = True
 
 
+def load_config() -> None:
+    """Load CHAIN_ID, TOKEN_ADDRESS, ... from settings if not done yet; no RPC calls."""
+    if not _config_loaded:
+        _load_config()
+
+
+def _read_web3() -> Any:
+    """Web3 for public reads: the payout connection, or one built from the RPC URL alone."""
+    if _state.web3 is not None:
+        return _state.web3
+    with _read_web3_lock:
+        if _state.read_web3 is None:
+            load_config()
+            if not _import_web3():
+                raise PayoutConfigError("web3.py dependencies are not installed")
+            provider = _load_str("WEB3_PROVIDER_URL")
+            if not provider:
+                raise PayoutConfigError("Missing payout settings: WEB3_PROVIDER_URL")
+            _state.read_web3 = Web3(_build_provider(provider))
+        return _state.read_web3
+
+
+def _build_provider(raw_urls: str) -> Any:
+    from . import rpc
+
+    urls = rpc.split_urls(raw_urls)
+    if len(urls) == 1:
+        return Web3.HTTPProvider(urls[0], request_kwargs={"timeout": 30})
+    return rpc.RoutingProvider(urls)
+
+
+def provider_stats() -> Optional[List[Dict[str, Any]]]:
+    """Per-endpoint routing stats when several RPC endpoints are configured."""
+    web3 = _state.web3
+    if web3 is None:
+        return None
+    stats = getattr(web3.provider, "endpoint_stats", None)
+    return stats() if stats else None
+
+
+def _run_background_init() -> None:
+    try:
+        _initialize_if_needed()
+    finally:
+        _state.initializing = False
+
+
+def start_background_init() -> bool:
+    """Begin initialization on a daemon thread unless it is done or running.
+
+    Returns True while initialization is still outstanding, so callers can
+    report an "initializing" state instead of blocking on RPC calls.
+    """
+    if _state.initialized or _state.error:
+        return False
+    with _init_start_lock:
+        if _state.initializing:
+            return True
+        if _state.initialized or _state.error:
+            return False
+        _state.initializing = True
+    threading.Thread(target=_run_background_init, name="eth-init", daemon=True).start()
+    return True
+
+
+async def initialize() -> None:
+    await asyncio.to_thread(_initialize_if_needed)
+
+
 def is_configured() -> bool:
     _initialize_if_needed()
     return _state.initialized and _state.error is None
 
 
 def current_status() -> Dict[str, Optional[Any]]:
-    _initialize_if_needed()
+    """Snapshot of the payout engine; never blocks on RPC calls."""
+    initializing = start_background_init()
     asset = _state.token_symbol or ("ETH" if _state.initialized and _state.error is None and not TOKEN_ADDRESS else None)
     return {
         "configured": _state.initialized and _state.error is None,
+        "initializing": initializing,
         "from_address": _state.from_address,
         "token_mode": bool(_state.erc20),
         "asset": asset,
@@ -202,13 +365,79 @@ def ensure_ready() -> None:
 
 
 def as_checksum(addr: str) -> str:
-    if Web3 is None:
+    if not _import_web3():
         raise PayoutConfigError("web3.py is not installed")
     if not Web3.is_address(addr):
         raise ValueError("invalid address")
     return Web3.to_checksum_address(addr)
 
 
+async def _sign_and_send(tx: Dict[str, Any], root_hash: Optional[str] = None) -> str:
+    """Sign, record and broadcast ``tx``; returns its hash.
+
+    The hash is recorded in ``payout_broadcasts`` before the raw transaction
+    leaves, so the watcher knows about every hash that could get mined. If
+    recording fails nothing is sent. ``root_hash`` defaults to the new hash,
+    i.e. the first broadcast for this nonce. If that first send raises, the
+    record is marked failed.
+    """
+    signed = _state.payer_account.sign_transaction(tx)
+    tx_hash = signed.hash.hex()
+    await asyncio.to_thread(
+        db.record_broadcast,
+        tx_hash,
+        root_hash or tx_hash,
+        int(tx["nonce"]),
+        int(tx["gasPrice"]),
+        json.dumps(tx, default=str),
+    )
+    try:
+        await asyncio.to_thread(_state.web3.eth.send_raw_transaction, signed.rawTransaction)
+    except Exception:
+        if root_hash is None:
+            # The caller returns these payouts to 'pending'; the watcher must
+            # not fee-bump and resend a transfer that is no longer wanted.
+            await asyncio.to_thread(db.fail_broadcast, tx_hash)
+        raise
+    return tx_hash
+
+
+async def replace_transaction(root_hash: str, tx_json: str, gas_price: int) -> str:
+    """Re-sign a recorded transaction with the same nonce and a higher gas price."""
+    ensure_ready()
+    tx = json.loads(tx_json)
+    tx["gasPrice"] = gas_price
+    return await _sign_and_send(tx, root_hash)
+
+
+async def transaction_receipt(tx_hash: str) -> Optional[Dict[str, Any]]:
+    ensure_ready()
+
+    from web3.exceptions import TransactionNotFound  # type: ignore
+
+    def fetch() -> Optional[Dict[str, Any]]:
+        try:
+            return dict(_state.web3.eth.get_transaction_receipt(tx_hash))
+        except TransactionNotFound:
+            return None
+
+    return await asyncio.to_thread(fetch)
+
+
+async def chain_head() -> Dict[str, int]:
+    """Current block number, mined nonce of the payout wallet and gas price."""
+    ensure_ready()
+
+    def fetch() -> Dict[str, int]:
+        return {
+            "block": int(_state.web3.eth.block_number),
+            "mined_nonce": int(_state.web3.eth.get_transaction_count(_state.from_address, "latest")),
+            "gas_price": int(_state.web3.eth.gas_price),
+        }
+
+    return await asyncio.to_thread(fetch)
+
+
 async def send_native(to_address: str, amount_wei: int) -> str:
     ensure_ready()
     if _state.web3 is None or _state.payer_account is None or _state.from_address is None:
@@ -224,9 +453,7 @@ async def send_native(to_address: str, amount_wei: int) -> str:
             "gas": 21_000,
             "gasPrice": gas_price,
         }
-        signed = _state.payer_account.sign_transaction(tx)
-        tx_hash = await asyncio.to_thread(_state.web3.eth.send_raw_transaction, signed.rawTransaction)
-        return tx_hash.hex()
+        return await _sign_and_send(tx)
 
 
 async def send_erc20(to_address: str, amount_units: int) -> str:
@@ -249,12 +476,96 @@ async def send_erc20(to_address: str, amount_units: int) -> str:
                 "nonce": nonce,
             }
         )
-        signed = _state.payer_account.sign_transaction(tx)
-        tx_hash = await asyncio.to_thread(_state.web3.eth.send_raw_transaction, signed.rawTransaction)
-        return tx_hash.hex()
+        return await _sign_and_send(tx)
+
+
+def read_token_stats(token_address: str, treasury_hint: Optional[str] = None) -> Dict[str, Any]:
+    """Read name/symbol/decimals/totalSupply/treasury and the treasury balance.
+
+    Everything is fetched in one Multicall3 ``eth_call``. ``balanceOf`` needs
+    the treasury address, so pass the previously seen one as ``treasury_hint``;
+    without it (or if the treasury changed) a second call fetches the balance.
+    Falls back to individual calls where Multicall3 is not deployed. Only
+    needs ``WEB3_PROVIDER_URL``, not the payout key.
+    """
+    web3 = _read_web3()
+    token = web3.eth.contract(address=Web3.to_checksum_address(token_address), abi=TOKEN_STATS_ABI)
+    fields = [
+        ("name", "string", token.encodeABI(fn_name="name")),
+        ("symbol", "string", token.encodeABI(fn_name="symbol")),
+        ("decimals", "uint8", token.encodeABI(fn_name="decimals")),
+        ("totalSupply", "uint256", token.encodeABI(fn_name="totalSupply")),
+        ("treasury", "address", token.encodeABI(fn_name="treasury")),
+    ]
+    if treasury_hint:
+        fields.append(("treasuryBalance", "uint256", token.encodeABI(fn_name="balanceOf", args=[treasury_hint])))
+
+    multicall = web3.eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)
+    calls = [(token.address, True, data) for _name, _type, data in fields]
+    calls.append((MULTICALL3_ADDRESS, False, multicall.encodeABI(fn_name="getBlockNumber")))
+    stats: Dict[str, Any] = {}
+    if _state.has_multicall3 is None:
+        _state.has_multicall3 = len(web3.eth.get_code(MULTICALL3_ADDRESS)) > 0
+    if not _state.has_multicall3:
+        # No Multicall3 on this chain: one call per field.
+        block = web3.eth.block_number
+        for name, _type, _data in fields:
+            fn = token.functions.balanceOf(treasury_hint) if name == "treasuryBalance" else getattr(token.functions, name)()
+            stats[name] = fn.call(block_identifier=block)
+        stats["block"] = int(block)
+    else:
+        results = multicall.functions.aggregate3(calls).call()
+        for (name, abi_type, _data), (success, data) in zip(fields, results[:-1]):
+            if not success:
+                raise ValueError(f"{name}() reverted; is {token.address} a LazyArtCoin token?")
+            stats[name] = web3.codec.decode([abi_type], data)[0]
+        stats["block"] = int(web3.codec.decode(["uint256"], results[-1][1])[0])
+
+    treasury = Web3.to_checksum_address(stats["treasury"])
+    if "treasuryBalance" not in stats or treasury != Web3.to_checksum_address(treasury_hint or treasury):
+        stats["treasuryBalance"] = token.functions.balanceOf(treasury).call(block_identifier=stats["block"])
+    return {
+        "address": token.address,
+        "name": stats["name"],
+        "symbol": stats["symbol"],
+        "decimals": int(stats["decimals"]),
+        # uint256 values as strings: they overflow JavaScript numbers
+        "totalSupply": str(stats["totalSupply"]),
+        "treasury": treasury,
+        "treasuryBalance": str(stats["treasuryBalance"]),
+        "block": stats["block"],
+        # Lets clients on another network ignore these numbers
+        "chainId": CHAIN_ID,
+    }
+
+
+_base_fee_cache: Dict[str, Any] = {"value": None, "fetched_at": 0.0}
+
+
+def base_fee_wei(max_age: float = BASE_FEE_CACHE_SECONDS) -> int:
+    """Latest block base fee, cached for about a block.
+
+    Falls back to ``gas_price`` on chains without EIP-1559 base fees.
+    """
+    ensure_ready()
+    cached = _base_fee_cache["value"]
+    if cached is not None and time.monotonic() - _base_fee_cache["fetched_at"] < max_age:
+        return cached
+    block = _state.web3.eth.get_block("latest")
+    value = block.get("baseFeePerGas")
+    if value is None:
+        value = _state.web3.eth.gas_price
+    _base_fee_cache["value"] = int(value)
+    _base_fee_cache["fetched_at"] = time.monotonic()
+    return int(value)
+
+
+def cached_base_fee_wei() -> Optional[int]:
+    return _base_fee_cache["value"]
 
 
 def describe_asset() -> str:
+    """Asset symbol for new payouts; never blocks on RPC calls."""
     status = current_status()
     if status["token_mode"]:
         return status["asset"] or "TOKEN"
@@ -264,7 +575,3 @@ def describe_asset() -> str:
 def token_decimals() -> Optional[int]:
     _initialize_if_needed()
     return _state.token_decimals
-
-
-# Initialize state using any existing settings on import
-reload()
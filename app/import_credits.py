@@ -0,0 +1,228 @@
+"""Bulk import of credit awards.
+
+Usage::
+
+    python -m app.import_credits awards.csv more.ndjson
+    python -m app.import_credits --bulk --batch-size 100000 backfill.csv
+    cat awards.ndjson | python -m app.import_credits --format ndjson -
+
+CSV input needs a header with ``user_id`` and ``credits`` columns and an
+optional ``reason`` column. NDJSON input is one object per line with the same
+keys. Rows are applied in large transactions via ``db.add_credits_bulk`` and
+progress is checkpointed in the database, so re-running the same command after
+a crash resumes where the last committed batch left off. A file's checkpoint is
+keyed by its path, size and modification time, and is deleted once the file
+has been read to the end, so a finished or rewritten file is imported afresh.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from typing import Iterator, List, Optional, TextIO, Tuple
+
+from dotenv import load_dotenv
+
+# Load environment before importing modules that read env at import time
+load_dotenv()
+
+if __package__ in (None, ""):
+    from pathlib import Path
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import db
+
+DEFAULT_REASON = "import"
+DEFAULT_BATCH_SIZE = 50_000
+MAX_REASON_LENGTH = 200
+# Largest value SQLite can store in an INTEGER column
+MAX_CREDITS = 2**63 - 1
+
+Row = Tuple[str, int, str]
+
+
+class RowError(ValueError):
+    pass
+
+
+def _validate(record: dict, default_reason: str) -> Row:
+    user_id = str(record.get("user_id") or "").strip()
+    if not user_id:
+        raise RowError("missing user_id")
+    raw_credits = record.get("credits")
+    if isinstance(raw_credits, bool) or raw_credits is None:
+        raise RowError("missing credits")
+    try:
+        credits = int(str(raw_credits).strip(), 10)
+    except ValueError:
+        raise RowError(f"credits is not an integer: {raw_credits!r}") from None
+    if credits <= 0:
+        raise RowError("credits must be > 0")
+    if credits > MAX_CREDITS:
+        raise RowError(f"credits larger than {MAX_CREDITS}")
+    reason = str(record.get("reason") or "").strip() or default_reason
+    if len(reason) > MAX_REASON_LENGTH:
+        raise RowError(f"reason longer than {MAX_REASON_LENGTH} characters")
+    return user_id, credits, reason
+
+
+def _records(stream: TextIO, fmt: str) -> Iterator[dict]:
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        missing = {"user_id", "credits"} - set(reader.fieldnames or [])
+        if missing:
+            raise SystemExit(f"CSV header is missing columns: {', '.join(sorted(missing))}")
+        yield from reader
+        return
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield {"__error__": f"invalid JSON: {exc.msg}"}
+            continue
+        yield record if isinstance(record, dict) else {"__error__": "expected a JSON object"}
+
+
+def _detect_format(path: str, requested: Optional[str]) -> str:
+    if requested:
+        return requested
+    lowered = path.lower()
+    if lowered.endswith((".ndjson", ".jsonl", ".json")):
+        return "ndjson"
+    return "csv"
+
+
+def _checkpoint_key(path: str, explicit: Optional[str]) -> Optional[str]:
+    if explicit:
+        return explicit
+    if path == "-":
+        return None
+    st = os.stat(path)
+    return f"file:{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def import_stream(
+    stream: TextIO,
+    fmt: str,
+    *,
+    checkpoint: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    default_reason: str = DEFAULT_REASON,
+    max_errors: int = 20,
+    log: TextIO = sys.stderr,
+) -> Tuple[int, int]:
+    """Import one stream; returns ``(imported, rejected)`` for this run."""
+    skip, resync = db.get_import_checkpoint_range(checkpoint) if checkpoint else (0, 0)
+    if skip:
+        print(f"Resuming {checkpoint} after {skip} rows", file=log)
+
+    imported = 0
+    rejected = 0
+    position = 0
+    batch: List[Row] = []
+    started = time.perf_counter()
+
+    def flush() -> None:
+        nonlocal imported
+        imported += db.add_credits_bulk(batch, (checkpoint, position) if checkpoint else None)
+        batch.clear()
+        elapsed = time.perf_counter() - started
+        rate = imported / elapsed if elapsed > 0 else 0.0
+        print(f"  {position} rows read, {imported} imported ({rate:,.0f} rows/s)", file=log)
+
+    for record in _records(stream, fmt):
+        position += 1
+        if position <= skip:
+            continue
+        try:
+            if "__error__" in record:
+                raise RowError(record["__error__"])
+            batch.append(_validate(record, default_reason))
+        except RowError as exc:
+            rejected += 1
+            if rejected <= max_errors:
+                print(f"  row {position}: {exc}", file=log)
+            elif rejected == max_errors + 1:
+                print("  further row errors suppressed", file=log)
+        # After a crash mid-batch some shards are ahead; end a batch exactly where
+        # they stopped so they can skip it while the others catch up.
+        if len(batch) >= batch_size or position == resync > skip:
+            flush()
+    if batch or (checkpoint and position > skip):
+        flush()
+    if checkpoint:
+        db.clear_import_checkpoint(checkpoint)
+
+    elapsed = time.perf_counter() - started
+    rate = imported / elapsed if elapsed > 0 else 0.0
+    print(
+        f"Imported {imported} rows ({rejected} rejected) in {elapsed:.2f}s, {rate:,.0f} rows/s",
+        file=log,
+    )
+    return imported, rejected
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.import_credits", description=__doc__.split("\n\n")[0])
+    parser.add_argument("paths", nargs="+", help="CSV/NDJSON files to import, or - for stdin")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="input format (default: by file extension)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="rows per transaction")
+    parser.add_argument("--reason", default=DEFAULT_REASON, help="reason for rows without one")
+    parser.add_argument("--checkpoint", help="checkpoint name (default: derived from the file path, size and mtime)")
+    parser.add_argument("--restart", action="store_true", help="ignore any saved checkpoint and start over")
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="relax durability PRAGMAs for the load",
+    )
+    args = parser.parse_args(argv)
+    if args.batch_size <= 0:
+        parser.error("--batch-size must be > 0")
+    if args.checkpoint and len(args.paths) > 1:
+        parser.error("--checkpoint can only be used with a single input")
+
+    db.init_db()
+    total_imported = 0
+    total_rejected = 0
+
+    def run() -> None:
+        nonlocal total_imported, total_rejected
+        for path in args.paths:
+            fmt = _detect_format(path, args.format)
+            key = _checkpoint_key(path, args.checkpoint)
+            if key and args.restart:
+                db.clear_import_checkpoint(key)
+            print(f"Importing {path} ({fmt})", file=sys.stderr)
+            if path == "-":
+                stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+                imported, rejected = import_stream(
+                    stream, fmt, checkpoint=key, batch_size=args.batch_size, default_reason=args.reason
+                )
+            else:
+                with open(path, encoding="utf-8", newline="") as stream:
+                    imported, rejected = import_stream(
+                        stream, fmt, checkpoint=key, batch_size=args.batch_size, default_reason=args.reason
+                    )
+            total_imported += imported
+            total_rejected += rejected
+
+    if args.bulk:
+        with db.bulk_load():
+            run()
+    else:
+        run()
+
+    if len(args.paths) > 1:
+        print(f"Total: {total_imported} imported, {total_rejected} rejected", file=sys.stderr)
+    return 1 if total_rejected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,341 @@
+"""Payout broadcast pipeline.
+
+With ``PAYOUT_NETTING_WINDOW`` unset (or 0) each payout is broadcast as soon
+as it is requested. With a window of N seconds, new payouts are stored as
+``queued`` and a background loop merges every queued row for the same
+(address, asset) into one on-chain transfer once the oldest of them has
+waited N seconds. Each row keeps its own credits/units and idempotency key;
+all rows in a merged transfer share its ``tx_hash``.
+
+Setting ``PAYOUT_ECONOMY_MAX_GWEI`` enables an economy tier in front of that
+path. Economy payouts (chosen per request, or by default for payouts below
+``PAYOUT_ECONOMY_BELOW_CREDITS``) are stored as ``held`` with a deadline in
+``payout_schedule``. They are released to ``queued`` in batches of
+``PAYOUT_ECONOMY_BATCH`` once the cached base fee is at or below the
+threshold, or individually when ``PAYOUT_ECONOMY_MAX_DELAY`` has passed.
+Because the hold lives in SQLite, held payouts survive restarts.
+
+Rows move ``[held ->] queued -> sending -> sent``. If the broadcast raises
+they go back to ``pending``, the same state a failed immediate payout is left
+in for manual reconciliation. Rows found in ``sending`` after a crash may or
+may not have been broadcast and are left for an operator to check.
+
+Every broadcast is also recorded in ``payout_broadcasts``. A watcher follows
+those until one is mined, then marks the payouts ``confirmed`` (or
+``reverted``) with the mined hash. With ``FEE_BUMP_MAX_GWEI`` set, a
+transaction not mined within ``STUCK_TX_BLOCKS`` blocks is re-signed with the
+same nonce and a gas price raised by ``FEE_BUMP_PERCENT`` (at least the
+current network price, never above the cap) and rebroadcast. Only the lowest
+unmined nonce is bumped, and only once it has been the lowest for a full
+watcher pass; later nonces are just queued behind it. Every replacement hash
+is kept, so confirmation follows whichever one is mined.
+Hashes are recorded before they are broadcast. If a chain's nonce has been
+used for ``DROPPED_TX_BLOCKS`` blocks and none of its hashes has a receipt,
+the nonce went to a transaction outside the chain. The chain and its payouts
+are then marked ``dropped`` for manual reconciliation.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+from . import db, eth
+
+log = logging.getLogger(__name__)
+
+MIN_POLL_INTERVAL = 0.5
+MAX_POLL_INTERVAL = 5.0
+
+TIER_INSTANT = "instant"
+TIER_ECONOMY = "economy"
+TIERS = (TIER_INSTANT, TIER_ECONOMY)
+DEFAULT_ECONOMY_MAX_DELAY = 3600
+DEFAULT_ECONOMY_BATCH = 50
+
+WATCH_INTERVAL = 15.0
+DEFAULT_STUCK_TX_BLOCKS = 12
+DEFAULT_FEE_BUMP_PERCENT = 15
+DEFAULT_DROPPED_TX_BLOCKS = 64
+# Nodes reject replacements that raise the fee by less than 10%.
+MIN_FEE_BUMP_PERCENT = 10
+
+
+class _Metrics:
+    rows_netted: int = 0
+    transfers_sent: int = 0
+    credits_sent: int = 0
+    economy_released: int = 0
+    fee_bumps: int = 0
+    confirmed: int = 0
+    dropped: int = 0
+
+
+metrics = _Metrics()
+
+# Lowest unmined nonce seen by the previous watcher pass
+_last_head_nonce: Optional[int] = None
+# root_hash -> first block at which the chain's nonce was used without a receipt
+_nonce_used_since: Dict[str, int] = {}
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return max(0, int(raw, 0))
+    except ValueError:
+        return default
+
+
+def _env_gwei(name: str) -> Optional[int]:
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return None
+    try:
+        gwei = float(raw)
+    except ValueError:
+        return None
+    return int(gwei * 10**9) if gwei > 0 else None
+
+
+# Read once at import, like db.DB_PATH; none of these are managed settings.
+NETTING_WINDOW = _env_int("PAYOUT_NETTING_WINDOW", 0)
+# Base fee at or below which held economy payouts are released
+ECONOMY_MAX_FEE_WEI = _env_gwei("PAYOUT_ECONOMY_MAX_GWEI")
+ECONOMY_BELOW_CREDITS = _env_int("PAYOUT_ECONOMY_BELOW_CREDITS", 0)
+ECONOMY_MAX_DELAY = _env_int("PAYOUT_ECONOMY_MAX_DELAY", DEFAULT_ECONOMY_MAX_DELAY)
+ECONOMY_BATCH = _env_int("PAYOUT_ECONOMY_BATCH", DEFAULT_ECONOMY_BATCH) or DEFAULT_ECONOMY_BATCH
+STUCK_TX_BLOCKS = max(1, _env_int("STUCK_TX_BLOCKS", DEFAULT_STUCK_TX_BLOCKS))
+FEE_BUMP_PERCENT = max(MIN_FEE_BUMP_PERCENT, _env_int("FEE_BUMP_PERCENT", DEFAULT_FEE_BUMP_PERCENT))
+FEE_BUMP_CAP_WEI = _env_gwei("FEE_BUMP_MAX_GWEI")
+DROPPED_TX_BLOCKS = max(1, _env_int("DROPPED_TX_BLOCKS", DEFAULT_DROPPED_TX_BLOCKS))
+
+
+def economy_enabled() -> bool:
+    return ECONOMY_MAX_FEE_WEI is not None
+
+
+def choose_tier(credits: int, requested: Optional[str]) -> str:
+    """Tier for a new payout; economy only applies when the scheduler is enabled."""
+    if requested and requested not in TIERS:
+        raise ValueError(f"priority must be one of: {', '.join(TIERS)}")
+    if not economy_enabled():
+        return TIER_INSTANT
+    if requested:
+        return requested
+    return TIER_ECONOMY if credits < ECONOMY_BELOW_CREDITS else TIER_INSTANT
+
+
+def scheduler_stats() -> Dict[str, Any]:
+    base_fee = eth.cached_base_fee_wei()
+    return {
+        "economy_max_gwei": ECONOMY_MAX_FEE_WEI / 10**9 if ECONOMY_MAX_FEE_WEI is not None else None,
+        "base_fee_gwei": round(base_fee / 10**9, 3) if base_fee is not None else None,
+        "max_delay_seconds": ECONOMY_MAX_DELAY,
+        "released": metrics.economy_released,
+    }
+
+
+def bumped_gas_price(previous: int, network: int, cap: int) -> Optional[int]:
+    """Gas price for a replacement, or None if the cap leaves no valid bump."""
+    required = previous * (100 + MIN_FEE_BUMP_PERCENT) // 100 + 1
+    target = max(previous * (100 + FEE_BUMP_PERCENT) // 100 + 1, network)
+    if required > cap:
+        return None
+    return min(target, cap)
+
+
+def watcher_stats() -> Dict[str, Any]:
+    return {
+        "stuck_after_blocks": STUCK_TX_BLOCKS,
+        "fee_bump_max_gwei": FEE_BUMP_CAP_WEI / 10**9 if FEE_BUMP_CAP_WEI is not None else None,
+        "fee_bumps": metrics.fee_bumps,
+        "confirmed": metrics.confirmed,
+        "dropped": metrics.dropped,
+    }
+
+
+def netting_enabled() -> bool:
+    return NETTING_WINDOW > 0
+
+
+def netting_stats() -> Dict[str, Any]:
+    transfers = metrics.transfers_sent
+    return {
+        "window_seconds": NETTING_WINDOW,
+        "rows": metrics.rows_netted,
+        "transfers": transfers,
+        "credits": metrics.credits_sent,
+        "coalescing_ratio": round(metrics.rows_netted / transfers, 3) if transfers else None,
+    }
+
+
+async def broadcast(to_address: str, units: int) -> str:
+    """Send ``units`` of the configured asset to ``to_address``."""
+    if eth.current_status()["token_mode"]:
+        return await eth.send_erc20(to_address, units)
+    return await eth.send_native(to_address, units)
+
+
+async def _send_rows(address: str, rows: List[Dict[str, Any]]) -> int:
+    ids = [row["id"] for row in rows]
+    total_units = sum(int(row["units"]) for row in rows)
+    try:
+        tx_hash = await broadcast(address, total_units)
+    except Exception:
+        log.exception("payout to %s failed (%d rows)", address, len(rows))
+        await asyncio.to_thread(db.set_payouts_status, ids, "pending")
+        return 0
+    await asyncio.to_thread(db.set_payouts_sent, ids, tx_hash)
+    metrics.rows_netted += len(rows)
+    metrics.transfers_sent += 1
+    metrics.credits_sent += sum(int(row["credits"]) for row in rows)
+    return 1
+
+
+async def flush_group(address: str, asset: str, merge: bool = True) -> int:
+    """Broadcast the queued rows for (address, asset); returns transfers sent."""
+    rows = await asyncio.to_thread(db.claim_queued_payouts, address, asset)
+    if merge:
+        return await _send_rows(address, rows) if rows else 0
+    sent = 0
+    for row in rows:
+        sent += await _send_rows(address, [row])
+    return sent
+
+
+async def flush_due() -> int:
+    """Broadcast every (address, asset) group whose window has elapsed."""
+    window = NETTING_WINDOW
+    try:
+        await asyncio.to_thread(eth.ensure_ready)
+    except eth.PayoutConfigError:
+        return 0
+    asset = eth.describe_asset()
+    sent = 0
+    for address, group_asset in await asyncio.to_thread(db.due_payout_groups, window):
+        # Rows queued under a different asset wait until that asset is configured again.
+        if group_asset != asset:
+            continue
+        sent += await flush_group(address, group_asset, merge=window > 0)
+    return sent
+
+
+async def release_economy() -> int:
+    """Release held economy payouts whose fee or deadline condition is met."""
+    max_fee = ECONOMY_MAX_FEE_WEI
+    # With the economy tier switched off, anything still held is released.
+    cheap = max_fee is None
+    if max_fee is not None:
+        try:
+            cheap = await asyncio.to_thread(eth.base_fee_wei) <= max_fee
+        except Exception:
+            # Unknown fee: only deadlines release payouts until the RPC recovers.
+            cheap = False
+    released = await asyncio.to_thread(db.release_held_payouts, ECONOMY_BATCH, not cheap)
+    metrics.economy_released += released
+    return released
+
+
+async def run_dispatcher() -> None:
+    while True:
+        window = NETTING_WINDOW
+        interval = min(MAX_POLL_INTERVAL, max(MIN_POLL_INTERVAL, window / 4)) if window else MAX_POLL_INTERVAL
+        await asyncio.sleep(interval)
+        try:
+            await release_economy()
+            await flush_due()
+        except Exception:
+            log.exception("payout dispatch pass failed")
+
+
+async def check_broadcasts() -> int:
+    """Resolve mined broadcasts and fee-bump stuck ones; returns replacements sent."""
+    global _last_head_nonce
+    chains = await asyncio.to_thread(db.pending_broadcast_chains)
+    if not chains:
+        return 0
+    await asyncio.to_thread(eth.ensure_ready)
+    head = await eth.chain_head()
+    # A nonce that only just became head-of-line may be mined without help now
+    # that its predecessor is out of the way.
+    head_settled = head["mined_nonce"] == _last_head_nonce
+    _last_head_nonce = head["mined_nonce"]
+    unstamped = [tx_hash for chain in chains for tx_hash in chain.get("unstamped", [])]
+    if unstamped:
+        # First sighting of these hashes: count their age from this block.
+        await asyncio.to_thread(db.stamp_broadcasts, unstamped, head["block"])
+        for chain in chains:
+            if not chain["latest"]["sent_block"]:
+                chain["latest"]["sent_block"] = head["block"]
+    cap = FEE_BUMP_CAP_WEI
+    bumps = 0
+    for chain in chains:
+        latest = chain["latest"]
+        # Give the payout row a block to record its tx_hash before resolving it.
+        if latest["sent_block"] >= head["block"]:
+            continue
+        if latest["nonce"] < head["mined_nonce"]:
+            root_hash = chain["root_hash"]
+            for tx_hash in chain["hashes"]:
+                receipt = await eth.transaction_receipt(tx_hash)
+                if receipt is not None:
+                    await asyncio.to_thread(
+                        db.resolve_broadcast, root_hash, tx_hash, receipt.get("status") == 1
+                    )
+                    _nonce_used_since.pop(root_hash, None)
+                    metrics.confirmed += 1
+                    break
+            else:
+                # Nonce used but no receipt yet: the node may lag, so look again
+                # for a while before concluding another transaction took the nonce.
+                since = _nonce_used_since.setdefault(root_hash, head["block"])
+                if head["block"] - since >= DROPPED_TX_BLOCKS:
+                    dropped = await asyncio.to_thread(db.drop_broadcast, root_hash)
+                    _nonce_used_since.pop(root_hash, None)
+                    metrics.dropped += 1
+                    log.warning(
+                        "nonce %d of %s was used by an untracked transaction; "
+                        "marked %d payouts dropped for reconciliation",
+                        latest["nonce"],
+                        root_hash,
+                        dropped,
+                    )
+            continue
+        if cap is None or head["block"] - latest["sent_block"] < STUCK_TX_BLOCKS:
+            continue
+        # Later nonces are only waiting behind this one; bumping them as well
+        # would re-sign the whole backlog.
+        if latest["nonce"] != head["mined_nonce"] or not head_settled:
+            continue
+        gas_price = bumped_gas_price(int(latest["gas_price"]), head["gas_price"], cap)
+        if gas_price is None:
+            continue
+        try:
+            tx_hash = await eth.replace_transaction(chain["root_hash"], latest["tx_json"], gas_price)
+        except Exception:
+            log.exception("fee bump for %s failed", chain["root_hash"])
+            continue
+        log.warning(
+            "replaced stuck tx %s (nonce %d) with %s at %d wei",
+            latest["tx_hash"],
+            latest["nonce"],
+            tx_hash,
+            gas_price,
+        )
+        metrics.fee_bumps += 1
+        bumps += 1
+    return bumps
+
+
+async def run_watcher() -> None:
+    while True:
+        await asyncio.sleep(WATCH_INTERVAL)
+        try:
+            await check_broadcasts()
+        except eth.PayoutConfigError:
+            continue
+        except Exception:
+            log.exception("stuck transaction check failed")
@@ -0,0 +1,285 @@
+"""Multi-endpoint JSON-RPC provider.
+
+``RoutingProvider`` wraps one ``HTTPProvider`` per endpoint and routes each
+request based on observed latency (EWMA) and error rate:
+
+* reads go to the fastest healthy endpoint and fail over on transport errors;
+* a read that is slower than the endpoint's recent latency percentile is
+  hedged to the next-best endpoint, and whichever answers first wins;
+* ``eth_sendRawTransaction`` is broadcast to several endpoints at once;
+* ``eth_getTransactionCount(..., "pending")`` is asked of every healthy
+  endpoint the last transaction was broadcast to, and the highest nonce that
+  arrives within a hedge delay of the first answer wins, so a node that has
+  not seen that transaction cannot hand out its nonce again.
+
+JSON-RPC error responses (reverts, "nonce too low", ...) are returned as-is,
+since another node would give the same answer. Only transport failures
+(timeouts, connection errors, HTTP errors) count against an endpoint.
+
+This module imports web3 at load time and is only imported by ``eth`` once a
+multi-endpoint ``WEB3_PROVIDER_URL`` is configured.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence
+
+from web3 import HTTPProvider  # type: ignore
+from web3.providers import JSONBaseProvider  # type: ignore
+
+BROADCAST_METHODS = frozenset({"eth_sendRawTransaction"})
+PENDING_NONCE_METHOD = "eth_getTransactionCount"
+
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_HEDGE_PERCENTILE = 0.9
+DEFAULT_MIN_HEDGE_DELAY = 0.05
+DEFAULT_INITIAL_HEDGE_DELAY = 0.5
+DEFAULT_BROADCAST_FANOUT = 3
+EWMA_ALPHA = 0.2
+LATENCY_WINDOW = 128
+MIN_SAMPLES_FOR_PERCENTILE = 8
+UNHEALTHY_ERROR_RATE = 0.5
+UNHEALTHY_CONSECUTIVE_FAILURES = 3
+COOLDOWN_SECONDS = 30.0
+EXECUTOR_WORKERS = 32
+
+# Shared by every RoutingProvider so eth.reload() does not leave idle pools
+# behind; threads are only started as requests need them.
+_executor = ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix="rpc")
+
+
+def split_urls(raw: str) -> List[str]:
+    """Parse a comma/whitespace separated list of RPC URLs, keeping order."""
+    urls: List[str] = []
+    for part in raw.replace(",", " ").split():
+        if part not in urls:
+            urls.append(part)
+    return urls
+
+
+class EndpointStats:
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.latency_ewma: Optional[float] = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.requests = 0
+        self.failures = 0
+        self._samples: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self.requests += 1
+            self._samples.append(latency)
+            if self.latency_ewma is None:
+                self.latency_ewma = latency
+            else:
+                self.latency_ewma += EWMA_ALPHA * (latency - self.latency_ewma)
+            self.error_rate *= 1 - EWMA_ALPHA
+            self.consecutive_failures = 0
+
+    def record_failure(self, latency: float) -> None:
+        with self._lock:
+            self.requests += 1
+            self.failures += 1
+            self._samples.append(latency)
+            self.error_rate += EWMA_ALPHA * (1 - self.error_rate)
+            self.consecutive_failures += 1
+            if (
+                self.consecutive_failures >= UNHEALTHY_CONSECUTIVE_FAILURES
+                or self.error_rate >= UNHEALTHY_ERROR_RATE
+            ):
+                self.cooldown_until = time.monotonic() + COOLDOWN_SECONDS
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+    def score(self) -> float:
+        if self.latency_ewma is None:
+            # Unmeasured endpoints sort first so every node gets probed once,
+            # unless they have never answered at all.
+            return float("inf") if self.failures else 0.0
+        return self.latency_ewma * (1 + 4 * self.error_rate)
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < MIN_SAMPLES_FOR_PERCENTILE:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(percentile * len(ordered)))
+        return ordered[index]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "latency_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "healthy": self.healthy(time.monotonic()),
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+class RoutingProvider(JSONBaseProvider):
+    def __init__(
+        self,
+        urls: Sequence[str],
+        *,
+        timeout: float = DEFAULT_TIMEOUT,
+        hedge_percentile: float = DEFAULT_HEDGE_PERCENTILE,
+        min_hedge_delay: float = DEFAULT_MIN_HEDGE_DELAY,
+        initial_hedge_delay: float = DEFAULT_INITIAL_HEDGE_DELAY,
+        broadcast_fanout: int = DEFAULT_BROADCAST_FANOUT,
+        provider_factory: Optional[Callable[[str, float], Any]] = None,
+    ) -> None:
+        super().__init__()
+        if not urls:
+            raise ValueError("at least one RPC endpoint is required")
+        factory = provider_factory or (
+            lambda url, t: HTTPProvider(url, request_kwargs={"timeout": t})
+        )
+        self._providers = [factory(url, timeout) for url in urls]
+        self._stats = [EndpointStats(url) for url in urls]
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay = min_hedge_delay
+        self.initial_hedge_delay = initial_hedge_delay
+        self.broadcast_fanout = max(1, broadcast_fanout)
+        self._broadcast_targets: List[int] = []
+
+    def __str__(self) -> str:
+        return f"RoutingProvider({', '.join(s.url for s in self._stats)})"
+
+    def endpoint_stats(self) -> List[Dict[str, Any]]:
+        return [stats.snapshot() for stats in self._stats]
+
+    def _ranked(self) -> List[int]:
+        now = time.monotonic()
+        order = sorted(range(len(self._stats)), key=lambda i: self._stats[i].score())
+        healthy = [i for i in order if self._stats[i].healthy(now)]
+        # If every endpoint is cooling down, still try them rather than fail outright.
+        return healthy + [i for i in order if i not in healthy]
+
+    def _call(self, index: int, method: str, params: Any) -> Any:
+        stats = self._stats[index]
+        started = time.monotonic()
+        try:
+            response = self._providers[index].make_request(method, params)
+        except Exception:
+            stats.record_failure(time.monotonic() - started)
+            raise
+        stats.record_success(time.monotonic() - started)
+        return response
+
+    def _hedge_delay(self, index: int) -> float:
+        delay = self._stats[index].latency_percentile(self.hedge_percentile)
+        if delay is None:
+            return self.initial_hedge_delay
+        return max(self.min_hedge_delay, delay)
+
+    def make_request(self, method: Any, params: Any) -> Any:
+        if method in BROADCAST_METHODS:
+            return self._broadcast(method, params)
+        if method == PENDING_NONCE_METHOD and len(params) > 1 and params[1] == "pending":
+            return self._pending_nonce(method, params)
+        return self._read(method, params)
+
+    def _read(self, method: Any, params: Any) -> Any:
+        ranked = self._ranked()
+        pending: Dict[Future, int] = {}
+        last_exc: Optional[BaseException] = None
+        next_candidate = 0
+
+        def launch() -> None:
+            nonlocal next_candidate
+            index = ranked[next_candidate]
+            next_candidate += 1
+            pending[_executor.submit(self._call, index, method, params)] = index
+
+        launch()
+        while pending:
+            hedge_available = next_candidate < len(ranked)
+            timeout = None
+            if hedge_available and len(pending) == 1:
+                timeout = self._hedge_delay(next(iter(pending.values())))
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # Primary is slower than usual: hedge to the next-best endpoint.
+                launch()
+                continue
+            for future in done:
+                pending.pop(future)
+                exc = future.exception()
+                if exc is None:
+                    return future.result()
+                last_exc = exc
+            if not pending and next_candidate < len(ranked):
+                launch()
+        assert last_exc is not None
+        raise last_exc
+
+    def _pending_nonce(self, method: Any, params: Any) -> Any:
+        now = time.monotonic()
+        candidates = self._broadcast_targets or self._ranked()[: self.broadcast_fanout]
+        targets = [index for index in candidates if self._stats[index].healthy(now)]
+        if not targets:
+            return self._read(method, params)
+        pending = {_executor.submit(self._call, index, method, params): index for index in targets}
+        best: Optional[Any] = None
+        first_error_response: Optional[Any] = None
+        deadline: Optional[float] = None
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # Grace period over: a node this slow must not hold up the nonce lock.
+                break
+            for future in done:
+                index = pending.pop(future)
+                if future.exception() is not None:
+                    continue
+                response = future.result()
+                if isinstance(response, dict) and "error" in response:
+                    if first_error_response is None:
+                        first_error_response = response
+                    continue
+                if best is None or int(response["result"], 16) > int(best["result"], 16):
+                    best = response
+                if deadline is None:
+                    # Give the other targets about as long as a normal answer takes.
+                    deadline = time.monotonic() + self._hedge_delay(index)
+        if best is not None:
+            return best
+        if first_error_response is not None:
+            return first_error_response
+        # No broadcast target answered: fall back to any endpoint.
+        return self._read(method, params)
+
+    def _broadcast(self, method: Any, params: Any) -> Any:
+        targets = self._ranked()[: self.broadcast_fanout]
+        self._broadcast_targets = targets
+        futures = [_executor.submit(self._call, index, method, params) for index in targets]
+        first_error_response: Optional[Any] = None
+        last_exc: Optional[BaseException] = None
+        remaining = set(futures)
+        while remaining:
+            done, remaining = wait(remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                exc = future.exception()
+                if exc is not None:
+                    last_exc = exc
+                    continue
+                response = future.result()
+                if isinstance(response, dict) and "error" in response:
+                    # e.g. "already known" from a node that saw the gossip first
+                    if first_error_response is None:
+                        first_error_response = response
+                    continue
+                return response
+        if first_error_response is not None:
+            return first_error_response
+        assert last_exc is not None
+        raise last_exc
@@ -2,7 +2,7 @@ import errno
 import os
 import json
 import asyncio
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from dotenv import load_dotenv
 import tornado.ioloop
@@ -18,7 +18,7 @@ if __package__ in (None, ""):
 
     sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from app import db, eth, settings as app_settings
+from app import db, eth, payouts, settings as app_settings, token_stats
 
 
 class IndexHandler(tornado.web.RequestHandler):
@@ -29,12 +29,22 @@ class IndexHandler(tornado.web.RequestHandler):
 class HealthHandler(tornado.web.RequestHandler):
     def get(self):
         status = eth.current_status()
+        if status["configured"]:
+            state = "ok"
+        elif status["initializing"]:
+            state = "initializing"
+        else:
+            state = "needs_config"
         self.write({
-            "status": "ok" if status["configured"] else "needs_config",
+            "status": state,
             "from": status["from_address"],
             "token_mode": bool(status["token_mode"]),
             "asset": status["asset"] or "ETH",
             "error": status["error"],
+            "rpc_endpoints": eth.provider_stats(),
+            "payout_netting": payouts.netting_stats() if payouts.netting_enabled() else None,
+            "payout_scheduler": payouts.scheduler_stats() if payouts.economy_enabled() else None,
+            "tx_watcher": payouts.watcher_stats(),
         })
 
 
@@ -67,22 +77,24 @@ class PayoutHandler(tornado.web.RequestHandler):
         if self.request.headers.get("Content-Type", "").startswith("application/json"):
             data = json.loads(self.request.body or b"{}")
         else:
-            fields = ["user_id", "address", "credits", "idempotency_key"]
+            fields = ["user_id", "address", "credits", "idempotency_key", "priority"]
             data = {k: self.get_body_argument(k, None) for k in fields}
         try:
             user_id = str(data["user_id"]).strip()
-            to = eth.as_checksum(str(data["address"]))
+            to = await asyncio.to_thread(eth.as_checksum, str(data["address"]))
             credits = int(data["credits"])  # type: ignore
             idempotency_key = (data.get("idempotency_key") or "").strip() or None  # type: ignore
             if credits <= 0:
                 raise ValueError("credits must be > 0")
+            priority = (data.get("priority") or "").strip().lower() or None  # type: ignore
+            tier = payouts.choose_tier(credits, priority)
         except Exception as e:
             self.set_status(400)
             self.write({"error": f"bad request: {e}"})
             return
 
         try:
-            eth.ensure_ready()
+            await asyncio.to_thread(eth.ensure_ready)
         except eth.PayoutConfigError as exc:
             self.set_status(503)
             self.write({"error": str(exc)})
@@ -91,11 +103,26 @@ class PayoutHandler(tornado.web.RequestHandler):
         status = eth.current_status()
         units = credits * eth.UNITS_PER_CREDIT
         asset = status["asset"] or "ETH"
+        netting = payouts.netting_enabled()
+        if tier == payouts.TIER_ECONOMY:
+            initial_status = "held"
+        elif netting:
+            initial_status = "queued"
+        else:
+            initial_status = "pending"
 
-        # Create a pending payout and reserve credits
+        # Create the payout row and reserve credits
         try:
             payout_row = await asyncio.to_thread(
-                db.debit_credits_for_payout, user_id, credits, to, str(units), asset, idempotency_key
+                db.debit_credits_for_payout,
+                user_id,
+                credits,
+                to,
+                str(units),
+                asset,
+                idempotency_key,
+                initial_status,
+                payouts.ECONOMY_MAX_DELAY if initial_status == "held" else None,
             )
         except ValueError as e:
             self.set_status(400)
@@ -107,17 +134,31 @@ class PayoutHandler(tornado.web.RequestHandler):
             return
 
         # If already exists and was returned due to idempotency, short-circuit
-        if payout_row.get("status") != "pending":
+        if payout_row.get("status") != initial_status:
             self.write({
                 "payout": payout_row,
             })
             return
 
-        try:
-            if status["token_mode"]:
-                tx_hash = await eth.send_erc20(to, units)
+        if initial_status != "pending":
+            # Broadcast later by payouts.run_dispatcher (economy hold and/or netting)
+            if self.request.headers.get("Accept", "").startswith("application/json"):
+                self.set_status(202)
+                self.write({
+                    "status": initial_status,
+                    "priority": tier,
+                    "asset": asset,
+                    "to": to,
+                    "credits_debited": credits,
+                    "units_queued": str(units),
+                    "payout_id": payout_row["id"],
+                })
             else:
-                tx_hash = await eth.send_native(to, units)
+                self.redirect(f"/user/{user_id}")
+            return
+
+        try:
+            tx_hash = await payouts.broadcast(to, units)
         except Exception as e:
             # Note: For MVP, we keep the debit and mark pending; admins can reconcile/refund manually.
             self.set_status(502)
@@ -147,11 +188,50 @@ class PayoutHandler(tornado.web.RequestHandler):
 
 class UserPageHandler(tornado.web.RequestHandler):
     async def get(self, user_id: str):
-        bal = await asyncio.to_thread(lambda: db.get_balance(db._connect(), user_id))
+        bal = await asyncio.to_thread(db.get_user_balance, user_id)
         payouts = list(await asyncio.to_thread(lambda: list(db.list_user_payouts(user_id))))
         self.render("user.html", user_id=user_id, balance=bal, payouts=payouts)
 
 
+class TokenStatsHandler(tornado.web.RequestHandler):
+    def set_default_headers(self):
+        # Read-only and public: the static website calls this cross-origin
+        self.set_header("Access-Control-Allow-Origin", "*")
+        self.set_header("Access-Control-Expose-Headers", "ETag")
+
+    def compute_etag(self):
+        # ETags are derived from the cached stats, not the response body
+        return None
+
+    async def get(self, address: str):
+        try:
+            entry, max_age = await token_stats.get(address)
+        except token_stats.UnknownToken as e:
+            self.set_status(404)
+            self.write({"error": str(e)})
+            return
+        except ValueError as e:
+            self.set_status(400)
+            self.write({"error": str(e)})
+            return
+        except eth.PayoutConfigError as exc:
+            self.set_status(503)
+            self.write({"error": str(exc)})
+            return
+        except Exception as e:
+            self.set_status(502)
+            self.write({"error": f"token read failed: {str(e)[:200]}"})
+            return
+
+        self.set_header("ETag", entry.etag)
+        self.set_header("Cache-Control", f"public, max-age={max_age}, stale-while-revalidate=60")
+        if entry.etag in self.request.headers.get("If-None-Match", ""):
+            self.set_status(304)
+            return
+        self.set_header("Content-Type", "application/json; charset=UTF-8")
+        self.write(entry.body)
+
+
 class SettingsHandler(tornado.web.RequestHandler):
     def get(self):
         status = eth.current_status()
@@ -167,7 +247,7 @@ class SettingsHandler(tornado.web.RequestHandler):
             error_message=None,
         )
 
-    def post(self):
+    async def post(self):
         env_overrides = {key: app_settings.has_env_override(key) for key in app_settings.MANAGED_KEYS}
         updates = {}
         errors = []
@@ -219,7 +299,8 @@ class SettingsHandler(tornado.web.RequestHandler):
 
         if updates:
             app_settings.set_many({k: v for k, v in updates.items() if k in app_settings.MANAGED_KEYS})
-        eth.reload()
+        await asyncio.to_thread(eth.reload)
+        eth.start_background_init()
         self.redirect("/settings?saved=1")
 
 
@@ -237,6 +318,7 @@ def make_app() -> tornado.web.Application:
             (r"/earn", EarnHandler),
             (r"/payout", PayoutHandler),
             (r"/user/(.+)", UserPageHandler),
+            (r"/api/token/([^/]+)/stats", TokenStatsHandler),
             (r"/settings", SettingsHandler),
             (r"/static/(.*)", tornado.web.StaticFileHandler, {"path": settings["static_path"]}),
         ],
@@ -257,18 +339,32 @@ def _bind_with_fallback(app: tornado.web.Application, preferred_port: int, attem
     raise RuntimeError(f"Could not bind to ports {preferred_port}-{port}")
 
 
+async def _report_payout_engine() -> None:
+    # Runs after the server is listening; RPC health checks happen off the IOLoop.
+    await eth.initialize()
+    status = eth.current_status()
+    if status["configured"]:
+        print(f"Payout engine ready as {status['from_address']}.")
+    else:
+        print(f"Payout engine unconfigured: {status['error']}")
+
+
 def main():
     db.init_db()
     app = make_app()
     preferred_port = int(os.environ.get("PORT", "8080"))
     bound_port = _bind_with_fallback(app, preferred_port)
-    from_addr = eth.current_from_address() or "unconfigured"
     host = os.environ.get("HOST", "127.0.0.1")
-    print(f"Listening on :{bound_port} as {from_addr}.")
+    print(f"Listening on :{bound_port}.")
     print(f"Open http://{host}:{bound_port}/ in your browser.")
     if bound_port != preferred_port:
         print(f"Port {preferred_port} was busy; using {bound_port} instead.")
-    tornado.ioloop.IOLoop.current().start()
+    eth.start_background_init()
+    io_loop = tornado.ioloop.IOLoop.current()
+    io_loop.spawn_callback(_report_payout_engine)
+    io_loop.spawn_callback(payouts.run_dispatcher)
+    io_loop.spawn_callback(payouts.run_watcher)
+    io_loop.start()
 
 
 if __name__ == "__main__":
@@ -4,7 +4,7 @@ from typing import Dict, Optional
 from . import db
 
 MANAGED_KEYS = {
-    "WEB3_PROVIDER_URL": "Ethereum RPC endpoint",
+    "WEB3_PROVIDER_URL": "Ethereum RPC endpoint(s), comma-separated",
     "PAYOUT_PRIVATE_KEY": "Hot wallet private key",
     "CHAIN_ID": "Chain ID",
     "TOKEN_ADDRESS": "ERC-20 contract address",
@@ -0,0 +1,95 @@
+"""Shared cache for the website's token stats.
+
+Each token's stats are refreshed at most once per ``TOKEN_STATS_TTL`` seconds
+(default 12, about one block) with a single batched RPC read, and concurrent
+requests during a refresh wait on the same read instead of issuing their own.
+
+Only tokens listed in ``TOKEN_STATS_ADDRESSES`` (comma-separated; default: the
+configured ``TOKEN_ADDRESS``) are served, so callers cannot make the server
+read, or cache, arbitrary contracts.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+
+from . import eth
+
+DEFAULT_TTL = 12
+
+
+def _env_ttl() -> int:
+    raw = os.environ.get("TOKEN_STATS_TTL", "").strip()
+    try:
+        return max(1, int(raw, 0)) if raw else DEFAULT_TTL
+    except ValueError:
+        return DEFAULT_TTL
+
+
+TTL = _env_ttl()
+ALLOWED_ADDRESSES = os.environ.get("TOKEN_STATS_ADDRESSES", "").replace(",", " ").split()
+
+
+class UnknownToken(LookupError):
+    pass
+
+
+class _Entry:
+    def __init__(self, stats: Dict[str, Any], fetched_at: float) -> None:
+        self.stats = stats
+        self.fetched_at = fetched_at
+        self.body = json.dumps(stats, sort_keys=True, separators=(",", ":"))
+        self.etag = '"' + hashlib.sha1(self.body.encode()).hexdigest() + '"'
+
+
+_cache: Dict[str, _Entry] = {}
+_inflight: Dict[str, "asyncio.Future[_Entry]"] = {}
+
+
+def allowed() -> Set[str]:
+    """Lower-cased addresses the endpoint serves."""
+    addresses = ALLOWED_ADDRESSES or [eth.TOKEN_ADDRESS]
+    return {address.strip().lower() for address in addresses if address.strip()}
+
+
+async def _refresh(key: str, previous: Optional[_Entry]) -> _Entry:
+    treasury_hint = previous.stats["treasury"] if previous else None
+    stats = await asyncio.to_thread(eth.read_token_stats, key, treasury_hint)
+    entry = _Entry(stats, time.monotonic())
+    _cache[key] = entry
+    # Drop tokens that are no longer served, e.g. after TOKEN_ADDRESS changed.
+    served = allowed()
+    for stale in [k for k in _cache if k.lower() not in served]:
+        del _cache[stale]
+    return entry
+
+
+async def get(address: str) -> Tuple[_Entry, int]:
+    """Cached stats for ``address`` and the seconds they remain fresh."""
+    if not ALLOWED_ADDRESSES and not eth.TOKEN_ADDRESS:
+        # TOKEN_ADDRESS stays empty until the payout config is loaded (it reads SQLite)
+        await asyncio.to_thread(eth.load_config)
+    if address.strip().lower() not in allowed():
+        raise UnknownToken(f"stats are not served for {address}")
+    key = eth.as_checksum(address)
+    max_age = TTL
+    entry = _cache.get(key)
+    now = time.monotonic()
+    if entry is None or now - entry.fetched_at >= max_age:
+        future = _inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(_refresh(key, entry))
+            _inflight[key] = future
+            future.add_done_callback(lambda _f: _inflight.pop(key, None))
+        try:
+            entry = await asyncio.shield(future)
+        except Exception:
+            if entry is None:
+                raise
+            # Serve the last good stats while the RPC is failing.
+            return entry, 0
+        now = time.monotonic()
+    return entry, max(0, int(max_age - (now - entry.fetched_at)))
@@ -0,0 +1,96 @@
+"""Compare a single RPC endpoint against RoutingProvider using stub nodes.
+
+Starts local JSON-RPC stubs with injected latency and issues sequential
+``eth_blockNumber`` reads, reporting p50/p99 latency::
+
+    python benchmarks/rpc_routing.py
+    python benchmarks/rpc_routing.py --requests 500 --spike-rate 0.1
+
+Node A is usually fast but occasionally stalls (``--spike-rate`` /
+``--spike-delay``), node B is consistently a little slower and node C is down.
+Requires web3 (see requirements.txt).
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from web3 import HTTPProvider  # noqa: E402
+
+from app.rpc import RoutingProvider  # noqa: E402
+
+
+def stub_node(latency: Callable[[], float]) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            time.sleep(latency())
+            payload = json.dumps({"jsonrpc": "2.0", "id": body.get("id"), "result": "0x10"}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(provider, count: int) -> List[float]:
+    samples = []
+    for _ in range(count):
+        started = time.perf_counter()
+        provider.make_request("eth_blockNumber", [])
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def report(label: str, samples: List[float]) -> None:
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))]
+    print(
+        f"{label:<10} p50 {statistics.median(ordered) * 1000:7.1f} ms   "
+        f"p99 {p99 * 1000:7.1f} ms   max {ordered[-1] * 1000:7.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--spike-rate", type=float, default=0.05)
+    parser.add_argument("--spike-delay", type=float, default=1.0)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+
+    def node_a() -> float:
+        return args.spike_delay if rng.random() < args.spike_rate else 0.005
+
+    node_b = stub_node(lambda: 0.015)
+    node_a_server = stub_node(node_a)
+    url_a = f"http://127.0.0.1:{node_a_server.server_address[1]}"
+    url_b = f"http://127.0.0.1:{node_b.server_address[1]}"
+    url_c = "http://127.0.0.1:9"  # nothing listens on the discard port
+
+    report("single", run(HTTPProvider(url_a, request_kwargs={"timeout": 30}), args.requests))
+    routed = RoutingProvider([url_c, url_a, url_b], timeout=5)
+    report("routed", run(routed, args.requests))
+    for stats in routed.endpoint_stats():
+        print(f"  {stats}")
+
+
+if __name__ == "__main__":
+    main()
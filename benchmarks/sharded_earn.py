@@ -0,0 +1,74 @@
+"""Measure earn throughput (``db.add_credits``) as DB_SHARDS grows.
+
+Each shard count runs in a fresh interpreter against a temporary directory,
+with several writer threads awarding credits to random users::
+
+    python benchmarks/sharded_earn.py
+    python benchmarks/sharded_earn.py --shards 1 2 4 8 --threads 16 --seconds 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = """
+import random, sys, threading, time
+from app import db
+
+threads, seconds, users = int(sys.argv[1]), float(sys.argv[2]), int(sys.argv[3])
+db.init_db()
+counts = [0] * threads
+stop = time.perf_counter() + seconds
+
+def work(slot):
+    rng = random.Random(slot)
+    n = 0
+    while time.perf_counter() < stop:
+        db.add_credits(f"user-{rng.randrange(users)}", 1, "earn")
+        n += 1
+    counts[slot] = n
+
+workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+for w in workers:
+    w.start()
+for w in workers:
+    w.join()
+print(sum(counts))
+"""
+
+
+def measure(shards: int, threads: int, seconds: float, users: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DB_PATH=os.path.join(tmp, "app.db"), DB_SHARDS=str(shards))
+        out = subprocess.run(
+            [sys.executable, "-c", WORKER, str(threads), str(seconds), str(users)],
+            cwd=ROOT,
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+    return int(out.strip().splitlines()[-1]) / seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--users", type=int, default=10_000)
+    args = parser.parse_args()
+
+    baseline = None
+    for shards in args.shards:
+        rate = measure(shards, args.threads, args.seconds, args.users)
+        baseline = baseline or rate
+        print(f"DB_SHARDS={shards:<3} {rate:10,.0f} earns/s  ({rate / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
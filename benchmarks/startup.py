@@ -0,0 +1,110 @@
+"""Measure server time-to-first-response.
+
+Starts ``python -m app.server`` against a throwaway database and polls
+``GET /health`` until it answers, reporting the elapsed time per run::
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 5 --rpc-delay 3
+
+``--rpc-delay`` points ``WEB3_PROVIDER_URL`` at a local JSON-RPC stub that
+sleeps before every reply, which is how a slow node looks during startup.
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DUMMY_PRIVATE_KEY = "0x" + "11" * 32
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _slow_rpc_server(delay: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            time.sleep(delay)
+            result = "0xaa36a7" if body.get("method") == "eth_chainId" else "0x1"
+            payload = json.dumps({"jsonrpc": "2.0", "id": body.get("id"), "result": result}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure_once(rpc_url: Optional[str], timeout: float) -> Tuple[float, dict]:
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, PORT=str(port), DB_PATH=os.path.join(tmp, "app.db"))
+        if rpc_url:
+            env.update(WEB3_PROVIDER_URL=rpc_url, PAYOUT_PRIVATE_KEY=DUMMY_PRIVATE_KEY)
+        started = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "app.server"],
+            cwd=ROOT,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            deadline = started + timeout
+            while time.perf_counter() < deadline:
+                if proc.poll() is not None:
+                    raise RuntimeError(f"server exited with code {proc.returncode}")
+                try:
+                    with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=timeout) as resp:
+                        body = json.loads(resp.read())
+                    return time.perf_counter() - started, body
+                except (urllib.error.URLError, ConnectionError):
+                    time.sleep(0.005)
+            raise RuntimeError(f"no response within {timeout}s")
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--rpc-delay", type=float, default=None, help="seconds the stub RPC waits per call")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    rpc_server = _slow_rpc_server(args.rpc_delay) if args.rpc_delay is not None else None
+    rpc_url = f"http://127.0.0.1:{rpc_server.server_address[1]}" if rpc_server else None
+    samples = []
+    for i in range(args.runs):
+        elapsed, body = measure_once(rpc_url, args.timeout)
+        samples.append(elapsed)
+        print(f"run {i + 1}: {elapsed * 1000:.0f} ms to first /health (status={body.get('status')})")
+    print(f"median: {statistics.median(samples) * 1000:.0f} ms over {len(samples)} runs")
+    if rpc_server:
+        rpc_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,33 @@
 
     const CONTRACT_STORAGE_KEY = "lac:contractAddress";
 
+    const statsApiMeta = document.querySelector('meta[name="lac-stats-api"]');
+    const STATS_API_BASE = ((statsApiMeta && statsApiMeta.content) || "").trim().replace(/\/+$/, "");
+
+    // Shared, server-side cached stats; null means "read from the chain directly".
+    const fetchCachedStats = async (address, provider, options = {}) => {
+        if (!STATS_API_BASE) {
+            return null;
+        }
+        try {
+            const response = await fetch(`${STATS_API_BASE}/api/token/${address}/stats`, options);
+            if (!response.ok) {
+                return null;
+            }
+            const stats = await response.json();
+            // The server reads its own chain; only trust it for the network this page uses.
+            const { chainId } = await provider.getNetwork();
+            if (Number(stats.chainId) !== Number(chainId)) {
+                console.warn(`Token stats API is on chain ${stats.chainId}, page is on ${chainId}; reading the chain directly.`);
+                return null;
+            }
+            return stats;
+        } catch (err) {
+            console.warn("Token stats API unavailable, falling back to RPC.", err);
+            return null;
+        }
+    };
+
     const defaultProvider = ethers.getDefaultProvider("mainnet");
     let walletProvider;
     let signer;
@@ -87,18 +114,23 @@
             const provider = getReadProvider();
             currentContract = new ethers.Contract(address, contractAbi, provider);
 
-            const [name, symbol, totalSupply, treasuryAddress] = await Promise.all([
-                currentContract.name(),
-                currentContract.symbol(),
-                currentContract.totalSupply(),
-                currentContract.treasury()
-            ]);
+            let name, symbol, totalSupply, treasuryAddress, treasuryBalance;
+            const cached = await fetchCachedStats(address, provider);
+            if (cached) {
+                ({ name, symbol, totalSupply, treasury: treasuryAddress, treasuryBalance } = cached);
+            } else {
+                [name, symbol, totalSupply, treasuryAddress] = await Promise.all([
+                    currentContract.name(),
+                    currentContract.symbol(),
+                    currentContract.totalSupply(),
+                    currentContract.treasury()
+                ]);
+                treasuryBalance = await currentContract.balanceOf(treasuryAddress);
+            }
 
             elements.contractAddress.textContent = address;
             elements.totalSupply.textContent = formatLac(totalSupply);
             elements.treasury.textContent = treasuryAddress;
-
-            const treasuryBalance = await currentContract.balanceOf(treasuryAddress);
             elements.treasuryBalance.textContent = formatLac(treasuryBalance);
 
             elements.initialSupply.textContent = `${name} (${symbol}) launched with ${formatLac(totalSupply)} minted.`;
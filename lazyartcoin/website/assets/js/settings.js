@@ -33,6 +33,33 @@
         renounceBtn: document.getElementById("renounce-ownership")
     };
 
+    const statsApiMeta = document.querySelector('meta[name="lac-stats-api"]');
+    const STATS_API_BASE = ((statsApiMeta && statsApiMeta.content) || "").trim().replace(/\/+$/, "");
+
+    // Shared, server-side cached stats; null means "read from the chain directly".
+    const fetchCachedStats = async (address, provider, options = {}) => {
+        if (!STATS_API_BASE) {
+            return null;
+        }
+        try {
+            const response = await fetch(`${STATS_API_BASE}/api/token/${address}/stats`, options);
+            if (!response.ok) {
+                return null;
+            }
+            const stats = await response.json();
+            // The server reads its own chain; only trust it for the network this page uses.
+            const { chainId } = await provider.getNetwork();
+            if (Number(stats.chainId) !== Number(chainId)) {
+                console.warn(`Token stats API is on chain ${stats.chainId}, page is on ${chainId}; reading the chain directly.`);
+                return null;
+            }
+            return stats;
+        } catch (err) {
+            console.warn("Token stats API unavailable, falling back to RPC.", err);
+            return null;
+        }
+    };
+
     const STORAGE_KEYS = {
         contract: "lac:contractAddress",
         owner: "lac:ownerAddress",
@@ -259,14 +286,20 @@
                 await loadArtifact();
             }
             const contract = getActiveContract(false);
-            const provider = walletProvider || ethers.getDefaultProvider(currentNetwork || 1);
-            const [name, symbol, totalSupply, treasuryAddress] = await Promise.all([
-                contract.name(),
-                contract.symbol(),
-                contract.totalSupply(),
-                contract.treasury()
-            ]);
-            const treasuryBalance = await contract.balanceOf(treasuryAddress);
+            let name, symbol, totalSupply, treasuryAddress, treasuryBalance;
+            // Revalidate so stats reflect recent mints once the server refreshes
+            const cached = await fetchCachedStats(await contract.getAddress(), contract.runner, { cache: "no-cache" });
+            if (cached) {
+                ({ name, symbol, totalSupply, treasury: treasuryAddress, treasuryBalance } = cached);
+            } else {
+                [name, symbol, totalSupply, treasuryAddress] = await Promise.all([
+                    contract.name(),
+                    contract.symbol(),
+                    contract.totalSupply(),
+                    contract.treasury()
+                ]);
+                treasuryBalance = await contract.balanceOf(treasuryAddress);
+            }
             let walletBalance = null;
             if (walletAddress) {
                 walletBalance = await contract.balanceOf(walletAddress);
@@ -0,0 +1,91 @@
+"""RoutingProvider against local JSON-RPC stub nodes.
+
+Run with ``python -m pytest``; skipped when web3 is not installed.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("web3")
+
+from app.rpc import RoutingProvider  # noqa: E402
+
+SLOW = 3.0
+DEAD_URL = "http://127.0.0.1:9"  # nothing listens on the discard port
+
+
+@pytest.fixture
+def stub_node():
+    servers = []
+
+    def start(delay: float = 0.0, nonce: int = 0) -> str:
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                time.sleep(delay)
+                result = hex(nonce) if body.get("method") == "eth_getTransactionCount" else "0x10"
+                payload = json.dumps({"jsonrpc": "2.0", "id": body.get("id"), "result": result}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def timed(provider: RoutingProvider, method: str, params: list):
+    started = time.monotonic()
+    response = provider.make_request(method, params)
+    return response, time.monotonic() - started
+
+
+def test_read_fails_over_from_dead_node(stub_node):
+    provider = RoutingProvider([DEAD_URL, stub_node()], timeout=5)
+    response, elapsed = timed(provider, "eth_blockNumber", [])
+    assert response["result"] == "0x10"
+    assert elapsed < 1.0
+
+
+def test_slow_read_is_hedged(stub_node):
+    provider = RoutingProvider([stub_node(delay=SLOW), stub_node()], timeout=5, initial_hedge_delay=0.05)
+    response, elapsed = timed(provider, "eth_blockNumber", [])
+    assert response["result"] == "0x10"
+    assert elapsed < 1.0
+
+
+def test_pending_nonce_takes_highest_answer(stub_node):
+    provider = RoutingProvider([stub_node(nonce=5), stub_node(nonce=7), stub_node(nonce=6)], timeout=5)
+    response, _ = timed(provider, "eth_getTransactionCount", ["0x" + "00" * 20, "pending"])
+    assert int(response["result"], 16) == 7
+
+
+def test_pending_nonce_does_not_wait_for_slow_node(stub_node):
+    urls = [stub_node(nonce=5), stub_node(nonce=7), stub_node(delay=SLOW, nonce=9)]
+    provider = RoutingProvider(urls, timeout=5, initial_hedge_delay=0.1)
+    response, elapsed = timed(provider, "eth_getTransactionCount", ["0x" + "00" * 20, "pending"])
+    assert int(response["result"], 16) == 7
+    assert elapsed < 1.0
+
+
+def test_pending_nonce_skips_dead_broadcast_target(stub_node):
+    provider = RoutingProvider([DEAD_URL, stub_node(nonce=4)], timeout=5, broadcast_fanout=2)
+    provider.make_request("eth_sendRawTransaction", ["0x00"])
+    response, elapsed = timed(provider, "eth_getTransactionCount", ["0x" + "00" * 20, "pending"])
+    assert int(response["result"], 16) == 4
+    assert elapsed < 1.0